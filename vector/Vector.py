@@ -1,10 +1,9 @@
 # coding=utf-8
-import traceback
-# 没有程序员会介意错误更详细一些
-from math import sqrt, pi, acos
-from decimal import Decimal, getcontext
+from functools import reduce
+from math import acos, degrees, hypot
+from decimal import Decimal, InvalidOperation
 
-getcontext().prec = 30
+import numpy as np
 
 
 class Vector(object):
@@ -14,29 +13,54 @@ class Vector(object):
 
     def __init__(self, coordinates):
         """
-        将向量转换为Decimal（精度更高）类型后存储，并初始化其长度，并初始化其索引，用于后续的取值
+        将向量转换为float64数组后存储（需要Decimal精度时请使用VectorExact），并初始化其长度，并初始化其索引，用于后续的取值
         :param coordinates: 输入坐标系，否则将报错
         """
         try:
-            if not coordinates:
-                raise ValueError
-            self.coordinates = tuple(Decimal(x) for x in coordinates)
-            self.dimension = len(coordinates)
-            self.idx = 0
-
-        except ValueError:
-            raise ValueError('The coordinates must be nonempty')
-
+            dimension = len(coordinates)
         except TypeError:
             raise TypeError('The coordinates must be an iterable')
+        if dimension == 0:
+            raise ValueError('The coordinates must be nonempty')
+
+        # 复制一份并设为只读：向量创建后坐标不再改变，长度和单位向量第一次用到时计算并缓存
+        # 无法转换为浮点数的坐标由NumPy抛出ValueError，说明是哪个值转换失败
+        self.coordinates = np.array(coordinates, dtype=np.float64)
+        self.coordinates.flags.writeable = False
+        self.dimension = dimension
+        self.idx = 0
+        self._magnitude = None
+        self._normalized = None
+
+    @classmethod
+    def _from_array(cls, coordinates):
+        """
+        直接包装运算得到的float64数组，跳过__init__中的校验与复制，仅供内部使用
+        :param coordinates: 一维float64数组，调用者不能再持有它的其他引用，包装后会被设为只读
+        :return: 新的向量
+        """
+        v = cls.__new__(cls)
+        coordinates.flags.writeable = False
+        v.coordinates = coordinates
+        v.dimension = len(coordinates)
+        v.idx = 0
+        v._magnitude = None
+        v._normalized = None
+        return v
+
+    @staticmethod
+    def _float_coordinates(v):
+        """
+        取另一个向量的float64坐标；v是Vector时不会复制，是VectorExact时把Decimal转换为float64
+        """
+        return np.asarray(v.coordinates, dtype=np.float64)
 
     def plus(self, v):
         """
         向量相加，每个向量之间相加
         :rtype: Vector
         """
-        new_coordinates = [x + y for x, y in zip(self.coordinates, v.coordinates)]
-        return Vector(new_coordinates)
+        return Vector._from_array(self.coordinates + Vector._float_coordinates(v))
 
     def minus(self, v):
         """
@@ -44,8 +68,7 @@ class Vector(object):
         :param v:减数 
         :return: 返回被减后的向量
         """
-        new_coordinates = [x - y for x, y in zip(self.coordinates, v.coordinates)]
-        return Vector(new_coordinates)
+        return Vector._from_array(self.coordinates - Vector._float_coordinates(v))
 
     def times_scaler(self, c):
         """
@@ -53,36 +76,49 @@ class Vector(object):
         :param c: 延长c倍
         :return: 返回被延长后的向量
         """
-        new_coordinates = [Decimal(c) * x for x in self.coordinates]
-        return Vector(new_coordinates)
+        c = float(c)
+        # 向量不可变，乘1时直接返回自身；乘0时不必逐个相乘
+        if c == 1.0:
+            return self
+        if c == 0.0:
+            return Vector._from_array(np.zeros_like(self.coordinates))
+        return Vector._from_array(self.coordinates * c)
 
     def magnitude(self):
         """
         标准化一个向量，需要把每个值的平方相加后再开方，代表
         :return: 
         """
-        coordinates_squared = [x ** 2 for x in self.coordinates]
-        return sqrt(sum(coordinates_squared))
+        if self._magnitude is None:
+            # 低维向量逐个用hypot累积，避免中间平方溢出，也省去np.linalg.norm的调用开销；高维时交给NumPy
+            if self.dimension <= 8:
+                self._magnitude = reduce(hypot, self.coordinates.tolist(), 0.0)
+            else:
+                self._magnitude = float(np.linalg.norm(self.coordinates))
+        return self._magnitude
 
     def normalized(self):
-        try:
-            magnitude = Decimal(self.magnitude())
-            return self.times_scaler(Decimal('1.0') / magnitude)
-        except ZeroDivisionError:
-            raise self.CANNOT_NORMALIZE_ZERO_VECTOR_MSG
+        if self._normalized is None:
+            try:
+                magnitude = self.magnitude()
+                self._normalized = self.times_scaler(1.0 / magnitude)
+            except ZeroDivisionError:
+                raise self.CANNOT_NORMALIZE_ZERO_VECTOR_MSG
+        return self._normalized
 
     def dot(self, v):
-        return sum([x * y for x, y in zip(self.coordinates, v.coordinates)])
+        return float(np.dot(self.coordinates, Vector._float_coordinates(v)))
 
     def angle_with(self, v, in_degrees=False):
         try:
             u1 = self.normalized()
             u2 = v.normalized()
-            angle_in_radians = acos(Decimal(u1.dot(u2)).quantize(Decimal('0.000')))
+            # 浮点误差可能让单位向量的点乘略超出[-1, 1]，截断后再交给acos
+            d = u1.dot(u2)
+            angle_in_radians = acos(max(-1.0, min(1.0, d)))
 
             if in_degrees:
-                degrees_per_radian = 180. / pi
-                return angle_in_radians * degrees_per_radian
+                return degrees(angle_in_radians)
             else:
                 return angle_in_radians
         except Exception as e:
@@ -94,55 +130,68 @@ class Vector(object):
     def is_orthogonal_to(self, v, tolerance=1e-10):
         return abs(self.dot(v)) < tolerance
 
-    def is_parallel_to(self, v):
-        return (self.is_zero() or
-                v.is_zero() or
-                self.angle_with(v) == 0 or
-                self.angle_with(v) == pi)
+    def is_parallel_to(self, v, tolerance=1e-10):
+        """
+        平行（同向或反向）当且仅当|u·v|等于|u|·|v|，不需要标准化也不需要acos
+        长度小于tolerance的向量（包括消元后只剩舍入误差的法向量）视为零向量，与任何向量平行
+        :param tolerance: 判断零向量的绝对误差，以及|u·v|与|u|·|v|之间的相对误差
+        """
+        if self.is_zero(tolerance) or v.is_zero(tolerance):
+            return True
+        d = abs(float(self.dot(v)))
+        m = float(self.magnitude()) * float(v.magnitude())
+        return abs(d - m) <= tolerance * m
 
     def is_zero(self, tolerance=1e-10):
-        return self.magnitude() < tolerance
+        # 比较长度的平方，省去一次开方
+        return self.dot(self) < tolerance * tolerance
 
     def component_parallel_to(self, basis):
+        """
+        self在basis上的投影 (self·b)/(b·b)·b，只做两次点乘，不需要先把basis标准化
+        :param basis: 投影方向
+        :return: 与basis平行的分量
+        """
+        b = Vector._float_coordinates(basis)
         try:
-            u = basis.normalized()
-            weight = self.dot(u)
-            return u.times_scaler(weight)
-        except Exception as e:
-            if str(e) == self.CANNOT_NORMALIZE_ZERO_VECTOR_MSG:
-                raise Exception(self.NO_UNIQUE_PARALLEL_COMPONENT_MSG)
-            else:
-                raise 'traceback.format_exc():\n%s' % traceback.format_exc()
+            weight = float(np.dot(self.coordinates, b)) / float(np.dot(b, b))
+        except ZeroDivisionError:
+            raise Exception(self.NO_UNIQUE_PARALLEL_COMPONENT_MSG)
+        return Vector._from_array(weight * b)
 
     def component_orthogonal_to(self, basis):
+        """
+        self减去它在basis上的投影，一次点乘权重再一次缩放相减完成
+        :param basis: 投影方向
+        :return: 与basis正交的分量
+        """
+        b = Vector._float_coordinates(basis)
         try:
-            projection = self.component_orthogonal_to(basis)
-            return self.minus(projection)
-        except Exception as e:
-            if str(e) == self.CANNOT_NORMALIZE_ZERO_VECTOR_MSG:
-                raise Exception(self.NO_UNIQUE_PARALLEL_COMPONENT_MSG)
-            else:
-                raise 'traceback.format_exc():\n%s' % traceback.format_exc()
+            weight = float(np.dot(self.coordinates, b)) / float(np.dot(b, b))
+        except ZeroDivisionError:
+            raise Exception(self.NO_UNIQUE_PARALLEL_COMPONENT_MSG)
+        return Vector._from_array(self.coordinates - weight * b)
 
     def cross(self, v):
-        try:
-            x_1, y_1, z_1 = self.coordinates
-            x_2, y_2, z_2 = v.coordinates
-            new_coordinates = Vector([y_1 * z_2 - y_2 * z_1,
-                                      -(x_1 * z_2 - x_2 * z_1),
-                                      x_1 * y_2 - x_2 * y_1])
-            return new_coordinates
-        except Exception as e:
-            msg = str(e)
-            if msg == 'need more than 2 values to unpack':
-                slef_embedded_in_R3 = Vector(self.coordinates + ('0',))
-                v_embedded_in_R3 = Vector(v.coordinates + ('0',))
-                return slef_embedded_in_R3.cross(v_embedded_in_R3)
-            elif (msg == 'too many values to unpack' or
-                          msg == 'need more than 1 value to unpack'):
-                raise Exception(self.ONLY_DEFINED_IN_TOW_THREE_DIMS_MSG)
-            else:
-                raise 'traceback.format_exc():\n%s' % traceback.format_exc()
+        """
+        叉乘，直接按维度分派：二维向量视为z=0的三维向量，结果只有z分量
+        :param v: 与self同为二维或三维的向量
+        :return: 三维向量
+        """
+        d = self.dimension
+        if d != v.dimension or d not in (2, 3):
+            raise Exception(self.ONLY_DEFINED_IN_TOW_THREE_DIMS_MSG)
+
+        if d == 2:
+            x_1, y_1 = self.coordinates
+            x_2, y_2 = v.coordinates
+            return self.__class__([0, 0, x_1 * y_2 - x_2 * y_1])
+
+        x_1, y_1, z_1 = self.coordinates
+        x_2, y_2, z_2 = v.coordinates
+        return self.__class__([y_1 * z_2 - y_2 * z_1,
+                               -(x_1 * z_2 - x_2 * z_1),
+                               x_1 * y_2 - x_2 * y_1])
 
     def area_of_parallelogram_with(self, v):
         cross_product = self.cross(v)
@@ -150,16 +199,57 @@ class Vector(object):
 
     def area_of_triangle_with(self, v):
         cross = self.cross(v)
-        return round(Decimal(cross.magnitude()) / Decimal('2.0'), 3)
+        return round(cross.magnitude() / 2, 3)
+
+    @staticmethod
+    def batch_dot(A, B):
+        """
+        批量点乘，一次计算N对向量，避免在Python层逐个调用dot
+        :param A: (N, d)的数组，每一行是一个向量
+        :param B: 与A形状相同
+        :return: (N,)的float64数组，第i项为A[i]·B[i]
+        """
+        A = np.ascontiguousarray(A, dtype=np.float64)
+        B = np.ascontiguousarray(B, dtype=np.float64)
+        if A.ndim != 2 or A.shape != B.shape:
+            raise ValueError('A and B must be (N, d) arrays of the same shape')
+        # 用到批量接口时才导入，普通使用者不必承担导入numba的开销
+        import vector_numba
+        return vector_numba.batch_dot(A, B)
+
+    @staticmethod
+    def batch_cross(A, B):
+        """
+        批量叉乘，与cross相同，二维向量先补上z=0再计算
+        :param A: (N, 2)或(N, 3)的数组，每一行是一个向量
+        :param B: 与A形状相同
+        :return: (N, 3)的float64数组，第i行为A[i]×B[i]
+        """
+        A = np.ascontiguousarray(A, dtype=np.float64)
+        B = np.ascontiguousarray(B, dtype=np.float64)
+        if A.ndim != 2 or A.shape != B.shape:
+            raise ValueError('A and B must be (N, d) arrays of the same shape')
+        if A.shape[1] == 2:
+            A = np.ascontiguousarray(np.pad(A, ((0, 0), (0, 1)), 'constant'))
+            B = np.ascontiguousarray(np.pad(B, ((0, 0), (0, 1)), 'constant'))
+        elif A.shape[1] != 3:
+            raise Exception(Vector.ONLY_DEFINED_IN_TOW_THREE_DIMS_MSG)
+        import vector_numba
+        return vector_numba.batch_cross(A, B)
 
     def __str__(self):
-        return 'Vector: {}'.format(self.coordinates)
+        return 'Vector: {}'.format(tuple(self.coordinates.tolist()))
 
     def __eq__(self, v):
-        return self.coordinates == v.coordinates
+        # 浮点坐标按误差范围比较；因此相等的向量未必有相同的哈希值，Vector不可哈希
+        other = Vector._float_coordinates(v)
+        return (self.coordinates.shape == other.shape and
+                np.allclose(self.coordinates, other, rtol=1e-10, atol=1e-10))
+
+    __hash__ = None
 
     def __getitem__(self, index):
-        return Decimal(self.coordinates[index])
+        return float(self.coordinates[index])
 
     # 这里感谢mentor帮助，我先前发现重复运行代码存在不同的回显百思不得其解，询问后才了解到这里的基础代码应补充一行idx=0
     def __iter__(self):
@@ -169,11 +259,88 @@ class Vector(object):
     def next(self):
         self.idx += 1
         try:
-            return Decimal(self.coordinates[self.idx - 1])
+            return self[self.idx - 1]
         except IndexError:
             self.idx = 0
             raise StopIteration  # Done iterating.
 
+
+class VectorExact(Vector):
+    """
+    以Decimal元组存储坐标的向量，保留旧版的高精度计算，仅供确实需要Decimal精度的场合使用，速度远慢于Vector
+    """
+
+    def __init__(self, coordinates):
+        try:
+            dimension = len(coordinates)
+        except TypeError:
+            raise TypeError('The coordinates must be an iterable')
+        if dimension == 0:
+            raise ValueError('The coordinates must be nonempty')
+
+        self.coordinates = tuple(Decimal(x) for x in coordinates)
+        self.dimension = dimension
+        self.idx = 0
+
+    @staticmethod
+    def _as_exact(v):
+        """
+        与普通Vector混合运算时，先把它的float64坐标精确地转换为Decimal
+        """
+        if isinstance(v, VectorExact):
+            return v
+        return VectorExact([Decimal(float(x)) for x in v.coordinates])
+
+    def plus(self, v):
+        v = VectorExact._as_exact(v)
+        new_coordinates = [x + y for x, y in zip(self.coordinates, v.coordinates)]
+        return VectorExact(new_coordinates)
+
+    def minus(self, v):
+        v = VectorExact._as_exact(v)
+        new_coordinates = [x - y for x, y in zip(self.coordinates, v.coordinates)]
+        return VectorExact(new_coordinates)
+
+    def times_scaler(self, c):
+        new_coordinates = [Decimal(c) * x for x in self.coordinates]
+        return VectorExact(new_coordinates)
+
+    def magnitude(self):
+        return sum([x ** 2 for x in self.coordinates]).sqrt()
+
+    def normalized(self):
+        try:
+            return self.times_scaler(Decimal('1.0') / self.magnitude())
+        except ZeroDivisionError:
+            raise self.CANNOT_NORMALIZE_ZERO_VECTOR_MSG
+
+    def dot(self, v):
+        v = VectorExact._as_exact(v)
+        return sum([x * y for x, y in zip(self.coordinates, v.coordinates)])
+
+    def component_parallel_to(self, basis):
+        basis = VectorExact._as_exact(basis)
+        try:
+            weight = self.dot(basis) / basis.dot(basis)
+        except (ZeroDivisionError, InvalidOperation):
+            raise Exception(self.NO_UNIQUE_PARALLEL_COMPONENT_MSG)
+        return basis.times_scaler(weight)
+
+    def component_orthogonal_to(self, basis):
+        return self.minus(self.component_parallel_to(basis))
+
+    def __str__(self):
+        return 'Vector: {}'.format(self.coordinates)
+
+    def __eq__(self, v):
+        if isinstance(v, VectorExact):
+            return self.coordinates == v.coordinates
+        # 与普通Vector比较时按float64坐标、同样的误差范围比较
+        return Vector(self.coordinates) == v
+
+    def __getitem__(self, index):
+        return Decimal(self.coordinates[index])
+
 # v1 = Vector([8.462, 7.893, -8.187])
 # w1 = Vector([6.984, -5.975, 4.778])
 #
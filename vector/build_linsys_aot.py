@@ -0,0 +1,20 @@
+# coding=utf-8
+# 用numba.pycc把linsys_numba.gaussian_eliminate提前编译成扩展模块linsys_aot，导入时不再有JIT编译的等待
+# 在vector目录下执行 python build_linsys_aot.py ，生成的linsys_aot会被linsys优先导入
+import os
+
+from numba.pycc import CC
+
+import linsys_numba
+
+cc = CC('linsys_aot')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+@cc.export('gaussian_eliminate', 'i8(f8[:, ::1], i8[::1])')
+def gaussian_eliminate(A, pivots):
+    return linsys_numba.gaussian_eliminate(A, pivots)
+
+
+if __name__ == '__main__':
+    cc.compile()
@@ -1,8 +1,30 @@
-from decimal import Decimal, getcontext
+import numpy as np
 
 from Vector import Vector
 
-getcontext().prec = 30
+
+NUM_DECIMAL_PLACES = 3
+
+
+def write_coefficient(coefficient, is_initial_term=False):
+    coefficient = round(coefficient, NUM_DECIMAL_PLACES)
+    if coefficient % 1 == 0:
+        coefficient = int(coefficient)
+
+    output = ''
+
+    if coefficient < 0:
+        output += '-'
+    if coefficient > 0 and not is_initial_term:
+        output += '+'
+
+    if not is_initial_term:
+        output += ' '
+
+    if abs(coefficient) != 1:
+        output += '{}'.format(abs(coefficient))
+
+    return output
 
 
 class Line(object):
@@ -17,8 +39,8 @@ class Line(object):
         self.normal_vector = normal_vector
 
         if not constant_term:
-            constant_term = Decimal('0')
-        self.constant_term = Decimal(constant_term)
+            constant_term = 0.0
+        self.constant_term = float(constant_term)
 
         self.set_basepoint()
 
@@ -29,12 +51,9 @@ class Line(object):
             basepoint_coords = ['0'] * self.dimension
 
             initial_index = Line.first_nonzero_index(n)
-            list = []
-            for x in n.coordinates:
-                list.append(x)
-            initial_coefficient = list[initial_index]
+            initial_coefficient = n[initial_index]
 
-            basepoint_coords[initial_index] = c / initial_coefficient
+            basepoint_coords[initial_index] = c / float(initial_coefficient)
             self.basepoint = Vector(basepoint_coords)
 
         except Exception as e:
@@ -45,34 +64,12 @@ class Line(object):
 
     def __str__(self):
 
-        num_decimal_places = 3
-
-        def write_coefficient(coefficient, is_initial_term=False):
-            coefficient = round(coefficient, num_decimal_places)
-            if coefficient % 1 == 0:
-                coefficient = int(coefficient)
-
-            output = ''
-
-            if coefficient < 0:
-                output += '-'
-            if coefficient > 0 and not is_initial_term:
-                output += '+'
-
-            if not is_initial_term:
-                output += ' '
-
-            if abs(coefficient) != 1:
-                output += '{}'.format(abs(coefficient))
-
-            return output
-
         n = self.normal_vector
 
         try:
             initial_index = Line.first_nonzero_index(n)
             terms = [write_coefficient(n[i], is_initial_term=(i == initial_index)) + 'x_{}'.format(i + 1)
-                     for i in range(self.dimension) if round(n[i], num_decimal_places) != 0]
+                     for i in range(self.dimension) if round(n[i], NUM_DECIMAL_PLACES) != 0]
             output = ' '.join(terms)
 
         except Exception as e:
@@ -81,7 +78,7 @@ class Line(object):
             else:
                 raise e
 
-        constant = round(self.constant_term, num_decimal_places)
+        constant = round(self.constant_term, NUM_DECIMAL_PLACES)
         if constant % 1 == 0:
             constant = int(constant)
         output += ' = {}'.format(constant)
@@ -90,9 +87,10 @@ class Line(object):
 
     @staticmethod
     def first_nonzero_index(vector):
-        for k, item in enumerate(vector.coordinates):
-            if not MyDecimal(item).is_near_zero():
-                return k
+        # 一次扫描整个坐标数组，找出第一个绝对值不小于1e-10的位置
+        nonzero = np.abs(vector.coordinates) >= 1e-10
+        if nonzero.any():
+            return int(nonzero.argmax())
         raise Exception(Line.NO_NONZERO_ELTS_FOUND_MSG)
 
     def is_parallel_to(self, ell):
@@ -112,30 +110,26 @@ class Line(object):
         return basepoint_difference.is_orthogonal_to(n)
 
     def intersection_with(self, ell):
-        try:
-            A, B = self.normal_vector.coordinates
-            C, D = ell.normal_vector.coordinates
-            k1 = self.constant_term
-            k2 = ell.constant_term
-            x_numerator = D * k1 - B * k2
-            y_numerator = -C * k1 + A * k2
-            one_over_denom = Decimal('1') / (A * D - B * C)
-
-            return Vector([x_numerator, y_numerator]).times_scaler(one_over_denom)
-
-        except ZeroDivisionError:
+        """
+        用克莱姆法则直接求2x2方程组的解，只做一次除法，不再构造中间的Vector
+        :return: 交点；两直线重合时返回self，平行不相交时返回None
+        """
+        A, B = Vector._float_coordinates(self.normal_vector).tolist()
+        C, D = Vector._float_coordinates(ell.normal_vector).tolist()
+        k1 = self.constant_term
+        k2 = ell.constant_term
+
+        # 是否平行交给与尺度无关的is_parallel_to判断，不平行时行列式必然不为0
+        if self.is_parallel_to(ell):
             if self == ell:
                 return self
             else:
                 return None
 
+        one_over_det = 1.0 / (A * D - B * C)
+        return Vector([(D * k1 - B * k2) * one_over_det, (-C * k1 + A * k2) * one_over_det])
 
 
-
-class MyDecimal(Decimal):
-    def is_near_zero(self, eps=1e-10):
-        return abs(self) < eps
-
 #
 # v1 = Line(normal_vector=Vector([4.046, 2.836]), constant_term=1.21)
 # w1 = Line(normal_vector=Vector([10.115, 7.09]), constant_term=3.025)
@@ -1,13 +1,16 @@
 # coding=utf-8
-import traceback
-from decimal import Decimal, getcontext
-
-from copy import deepcopy
+import numpy as np
 
 from Vector import Vector
 from plane import Plane
-
-getcontext().prec = 30
+# 优先使用提前编译好的内核（Cython扩展或build_linsys_aot.py生成的linsys_aot，都没有JIT开销），都没有时退回numba版本
+try:
+    from linsys_kernel import gaussian_eliminate
+except ImportError:
+    try:
+        from linsys_aot import gaussian_eliminate
+    except ImportError:
+        from linsys_numba import gaussian_eliminate
 
 
 class LinearSystem(object):
@@ -21,131 +24,180 @@ class LinearSystem(object):
             for p in planes:
                 assert p.dimension == d
 
-            self.planes = planes
+            # 方程组以一个(n, dimension+1)的float64增广矩阵保存，前dimension列为系数，最后一列为常数项
+            self._aug = np.array([np.append(p.normal_vector.coordinates, p.constant_term) for p in planes],
+                                 dtype=np.float64)
             self.dimension = d
+            # 每一行主元所在的列（-1表示该行全为0），消元时顺便记录下来，行变换后失效，用到时再重新扫描
+            self._pivots = None
 
         except AssertionError:
             raise Exception(self.ALL_PLANES_MUST_BE_IN_SAME_DIM_MSG)
 
+    @classmethod
+    def _from_augmented(cls, augmented, dimension, pivots=None):
+        """
+        直接用增广矩阵构造方程组，不经过Plane，仅供内部使用
+        :param augmented: (n, dimension+1)的float64数组，不会被复制
+        :param dimension: 方程组的维度
+        :param pivots: 已知的每行主元列，未知时为None
+        :return: 新的方程组
+        """
+        system = cls.__new__(cls)
+        system._aug = augmented
+        system.dimension = dimension
+        system._pivots = pivots
+        return system
+
+    @property
+    def planes(self):
+        """
+        只读：按增广矩阵当前的行重新组装的Plane元组，修改方程请用s[i] = plane
+        """
+        return tuple(self[i] for i in range(len(self)))
+
     def swap_rows(self, row1, row2):
-        cache = self[row1]
-        self[row1] = self[row2]
-        self[row2] = cache
+        self._aug[[row1, row2]] = self._aug[[row2, row1]]
+        self._pivots = None
         return self
 
     def multiply_coefficient_and_row(self, coefficient, row):
-        self[row] = Plane(normal_vector=self[row].normal_vector.times_scaler(coefficient),
-                          constant_term=coefficient * self[row].constant_term)
+        self._aug[row] *= coefficient
+        self._pivots = None
         return self
 
     def add_multiple_times_row_to_row(self, coefficient, row_to_add, row_to_be_added_to):
-        self[row_to_be_added_to] = Plane(normal_vector=self[row_to_add].normal_vector.times_scaler(coefficient).plus(
-            self[row_to_be_added_to].normal_vector),
-            constant_term=coefficient * self[row_to_add].constant_term + self[
-                row_to_be_added_to].constant_term)
+        self._aug[row_to_be_added_to] += coefficient * self._aug[row_to_add]
+        self._pivots = None
         return self
 
     def indices_of_first_nonzero_terms_in_each_row(self):
-        num_equations = len(self)
-        num_variables = self.dimension
+        if self._pivots is None:
+            nonzero = np.abs(self._aug[:, :-1]) >= 1e-10
+            self._pivots = np.where(nonzero.any(axis=1), nonzero.argmax(axis=1), -1)
 
-        indices = [-1] * num_equations
-
-        for i, p in enumerate(self.planes):
-            try:
-                indices[i] = p.first_nonzero_index(p.normal_vector)
-            except Exception as e:
-                if str(e) == Plane.NO_NONZERO_ELTS_FOUND_MSG:
-                    continue
-                else:
-                    raise 'traceback.format_exc():\n%s' % traceback.format_exc()
-
-        return indices
+        return self._pivots.tolist()
 
     def __len__(self):
-        return len(self.planes)
+        return self._aug.shape[0]
 
     def __getitem__(self, i):
-        return self.planes[i]
+        # 每次取值都按当前的行重新组装一个Plane，复制一份系数，之后的行变换不会影响已经取出的Plane
+        row = self._aug[i]
+        return Plane(normal_vector=Vector(row[:-1].copy()), constant_term=row[-1])
 
     def __setitem__(self, i, x):
         try:
             assert x.dimension == self.dimension
-            self.planes[i] = x
+            self._aug[i, :-1] = x.normal_vector.coordinates
+            self._aug[i, -1] = x.constant_term
+            self._pivots = None
 
         except AssertionError:
             raise Exception(self.ALL_PLANES_MUST_BE_IN_SAME_DIM_MSG)
 
     def __str__(self):
         ret = 'Linear System:\n'
-        temp = ['Equation {}: {}'.format(i + 1, p) for i, p in enumerate(self.planes)]
+        temp = ['Equation {}: {}'.format(i + 1, self[i]) for i in range(len(self))]
         ret += '\n'.join(temp)
         return ret
 
     def compute_triangular_form(self):
-        system = deepcopy(self)
+        system = LinearSystem._from_augmented(self._aug.copy(), self.dimension)
         num_equations = len(system)
         num_variables = system.dimension
+        pivots = np.full(num_equations, -1, dtype=np.int64)
 
         j = 0
 
         for i in range(num_equations):
             while j < num_variables:
-                c = MyDecimal(system[i].normal_vector[j])
-                if c.is_near_zero():
-                    swap_succeeded = system.swap_with_row_below_for_nozero_coefficient_if_able(i, j)
-                    if not swap_succeeded:
-                        j += 1
-                        continue
+                swap_succeeded = system.swap_with_row_below_for_nozero_coefficient_if_able(i, j)
+                if not swap_succeeded:
+                    j += 1
+                    continue
                 system.clear_coefficients_below(i, j)
+                pivots[i] = j
                 j += 1
                 break
 
+        system._pivots = pivots
         return system
 
     def swap_with_row_below_for_nozero_coefficient_if_able(self, row, col):
-        num_equations = len(self)
-        for k in range(row + 1, num_equations):
-            coefficient = MyDecimal(self[k].normal_vector[col])
-            if not coefficient.is_near_zero():
-                self.swap_rows(row, k)
-                return True
-        return False
+        """
+        部分主元法：在第row行及其下方选出第col列绝对值最大的一行换到第row行，数值上比取第一个非零行更稳定
+        :return: 这一列是否存在可用的主元
+        """
+        sub = self._aug[row:, col]
+        k = int(np.argmax(np.abs(sub)))
+        if abs(sub[k]) < 1e-10:
+            return False
+        if k:
+            self.swap_rows(row, row + k)
+        return True
 
     def clear_coefficients_below(self, row, col):
-        num_equations = len(self)
-        beta = MyDecimal(self[row].normal_vector[col])
-        for k in range(row + 1, num_equations):
-            n = self[k].normal_vector
-            gamma = n[col]
-            alpha = -gamma / beta
-            self.add_multiple_times_row_to_row(alpha, row, k)
+        # 下面所有行一次广播完成：第k行减去 A[k, col] / beta 倍的主元行，1 / beta只算一次
+        one_over_beta = 1.0 / self._aug[row, col]
+        below = self._aug[row + 1:]
+        below -= (below[:, col:col + 1] * one_over_beta) * self._aug[row]
+        self._pivots = None
 
     def compute_rref(self):
-        tf = self.compute_triangular_form()
-        num_equations = len(tf)
-        pivot_indices = tf.indices_of_first_nonzero_terms_in_each_row()
+        """
+        复制一份增广矩阵交给gaussian_eliminate原地消元
+        :return: 化为rref后的新方程组
+        """
+        augmented = self._aug.copy()
+        pivots = np.full(len(self), -1, dtype=np.int64)
+        gaussian_eliminate(augmented, pivots)
 
-        for i in range(num_equations)[::-1]:
-            j = pivot_indices[i]
-            if j < 0:
-                continue
-            tf.scale_row_to_make_coefficient_equal_one(i, j)
-            tf.clear_coefficients_above(i, j)
-
-        return tf
+        return LinearSystem._from_augmented(augmented, self.dimension, pivots)
 
     def scale_row_to_make_coefficient_equal_one(self, row, col):
-        n = self[row].normal_vector
-        beta = Decimal('1.0') / n[col]
+        beta = 1.0 / self._aug[row, col]
         self.multiply_coefficient_and_row(beta, row)
 
     def clear_coefficients_above(self, row, col):
         for k in range(row)[::-1]:
-            n = self[k].normal_vector
-            alpha = -n[col]
+            alpha = -self._aug[k, col]
             self.add_multiple_times_row_to_row(alpha, row, k)
 
+    @staticmethod
+    def batch_solve(As, bs):
+        """
+        一次求解N个互相独立的d元方程组 As[i]·x = bs[i]，装了CuPy时在GPU上批量LU分解，否则用np.linalg.solve
+        只适合成百上千个方程组的批量场景，单个方程组请用compute_solution（数据拷贝到GPU的开销不值得）
+        每个方程组都必须有唯一解，奇异矩阵会抛出LinAlgError，不会像compute_solution那样区分无解和无穷多解
+        CuPy只在调用时才导入，单个方程组的使用者不会付出导入开销；没有CuPy或没有可用的GPU/驱动时退回NumPy
+        :param As: (N, d, d)的系数矩阵
+        :param bs: (N, d)的常数项
+        :return: (N, d)的float64数组，第i行为第i个方程组的解
+        """
+        As = np.asarray(As, dtype=np.float64)
+        bs = np.asarray(bs, dtype=np.float64)
+        if As.ndim != 3 or As.shape[1] != As.shape[2] or bs.shape != As.shape[:2]:
+            raise ValueError('As must be (N, d, d) and bs must be (N, d)')
+
+        try:
+            import cupy
+        except ImportError:
+            cupy = None
+
+        # 常数项补成(N, d, 1)的列向量，避免NumPy 2对(N, d)形状的b按矩阵解释
+        if cupy is not None:
+            try:
+                x = cupy.linalg.solve(cupy.asarray(As), cupy.asarray(bs[..., np.newaxis]))
+                # CuPy默认遇到奇异矩阵只会得到NaN/inf而不报错，这里与NumPy保持一致
+                if not bool(cupy.isfinite(x).all()):
+                    raise np.linalg.LinAlgError('Singular matrix')
+                return cupy.asnumpy(x)[..., 0]
+            except (cupy.cuda.runtime.CUDARuntimeError, cupy.cuda.driver.CUDADriverError):
+                # 装了CuPy但没有可用的设备或驱动
+                pass
+        return np.linalg.solve(As, bs[..., np.newaxis])[..., 0]
+
     def compute_solution(self):
         try:
             return self.do_gaussian_elimination_and_extract_solution()
@@ -163,19 +215,14 @@ class LinearSystem(object):
 
         num_variables = rref.dimension
 
-        solution_coordinates = [rref.planes[i].constant_term for i in range(num_variables)]
-        return Vector(solution_coordinates)
+        return Vector(rref._aug[:num_variables, -1].copy())
 
     def raise_exception_if_contradictory_equation(self):
-        for p in self.planes:
-            try:
-                p.first_nonzero_index(p.normal_vector)
-            except Exception as e:
-                if str(e) == 'No nonzero elements found':
-
-                    constant_term = MyDecimal(p.constant_term)
-                    if not constant_term.is_near_zero():
-                        raise Exception(self.NO_SOLUTIONS_MSG)
+        pivot_indices = self.indices_of_first_nonzero_terms_in_each_row()
+        for i, index in enumerate(pivot_indices):
+            if index < 0:
+                if abs(self._aug[i, -1]) >= 1e-10:
+                    raise Exception(self.NO_SOLUTIONS_MSG)
 
     def raise_exception_if_too_few_pivots(self):
         pivot_indices = self.indices_of_first_nonzero_terms_in_each_row()
@@ -187,11 +234,6 @@ class LinearSystem(object):
             raise Exception(self.INF_SOLUTIONS_MSG)
 
 
-class MyDecimal(Decimal):
-    def is_near_zero(self, eps=1e-10):
-        return abs(self) < eps
-
-
 p1 = Plane(normal_vector=Vector(['5.862', '1.178', '-10.366']), constant_term='-8.15')
 p2 = Plane(normal_vector=Vector(['-2.931', '-0.589', '5.183']), constant_term='-4.075')
 s = LinearSystem([p1, p2])
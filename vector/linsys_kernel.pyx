@@ -0,0 +1,67 @@
+# coding=utf-8
+# cython: language_level=2
+# 高斯消元内核的Cython版本，与linsys_numba.gaussian_eliminate行为完全一致，供不想依赖numba的环境使用
+# 编译：在vector目录下执行 cythonize -i linsys_kernel.pyx ；未编译时linsys会自动改用linsys_numba
+cimport cython
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef Py_ssize_t _eliminate(double[:, ::1] A, long long[::1] pivots, double eps) nogil:
+    cdef Py_ssize_t n = A.shape[0]
+    cdef Py_ssize_t width = A.shape[1]
+    cdef Py_ssize_t row = 0
+    cdef Py_ssize_t col, pivot, j, k
+    cdef double best, cache, beta, alpha
+
+    for col in range(width - 1):
+        if row >= n:
+            break
+
+        pivot = row
+        best = abs(A[row, col])
+        for k in range(row + 1, n):
+            if abs(A[k, col]) > best:
+                best = abs(A[k, col])
+                pivot = k
+        if best < eps:
+            continue
+
+        if pivot != row:
+            for j in range(width):
+                cache = A[row, j]
+                A[row, j] = A[pivot, j]
+                A[pivot, j] = cache
+
+        beta = 1.0 / A[row, col]
+        for j in range(col, width):
+            A[row, j] *= beta
+        A[row, col] = 1.0
+
+        for k in range(n):
+            if k == row:
+                continue
+            alpha = -A[k, col]
+            if alpha != 0.0:
+                for j in range(col, width):
+                    A[k, j] += alpha * A[row, j]
+                A[k, col] = 0.0
+
+        pivots[row] = col
+        row += 1
+
+    return row
+
+
+def gaussian_eliminate(double[:, ::1] A, long long[::1] pivots, double eps=1e-10):
+    """
+    原地把增广矩阵化为简化行阶梯形（rref），使用部分主元法选取每一列绝对值最大的行作为主元行
+    :param A: 形状为(n, m+1)的C连续float64数组，前m列为系数，最后一列为常数项
+    :param pivots: 长度为n、初始全为-1的int64数组，第i行的主元列会写入pivots[i]
+    :param eps: 绝对值小于eps的系数视为0
+    :return: 主元的个数（即矩阵的秩）
+    """
+    cdef Py_ssize_t rank
+    with nogil:
+        rank = _eliminate(A, pivots, eps)
+    return rank
@@ -0,0 +1,62 @@
+# coding=utf-8
+# 高斯消元的数值内核：整个增广矩阵放在一个float64二维数组里原地消元，不再为每一次行变换新建Plane和Vector
+try:
+    from numba import njit
+except ImportError:
+    # 没有安装numba时退化为普通的Python函数，结果相同，只是速度慢一些
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def gaussian_eliminate(A, pivots, eps=1e-10):
+    """
+    原地把增广矩阵化为简化行阶梯形（rref），使用部分主元法选取每一列绝对值最大的行作为主元行
+    :param A: 形状为(n, m+1)的float64数组，前m列为系数，最后一列为常数项
+    :param pivots: 长度为n、初始全为-1的int64数组，第i行的主元列会写入pivots[i]
+    :param eps: 绝对值小于eps的系数视为0
+    :return: 主元的个数（即矩阵的秩）
+    """
+    n = A.shape[0]
+    width = A.shape[1]
+    row = 0
+
+    for col in range(width - 1):
+        if row >= n:
+            break
+
+        pivot = row
+        best = abs(A[row, col])
+        for k in range(row + 1, n):
+            if abs(A[k, col]) > best:
+                best = abs(A[k, col])
+                pivot = k
+        if best < eps:
+            continue
+
+        if pivot != row:
+            for j in range(width):
+                cache = A[row, j]
+                A[row, j] = A[pivot, j]
+                A[pivot, j] = cache
+
+        beta = 1.0 / A[row, col]
+        for j in range(col, width):
+            A[row, j] *= beta
+        A[row, col] = 1.0
+
+        for k in range(n):
+            if k == row:
+                continue
+            alpha = -A[k, col]
+            if alpha != 0.0:
+                for j in range(col, width):
+                    A[k, j] += alpha * A[row, j]
+                A[k, col] = 0.0
+
+        pivots[row] = col
+        row += 1
+
+    return row
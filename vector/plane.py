@@ -1,9 +1,33 @@
 # coding=utf-8
-from decimal import Decimal, getcontext
 import traceback
+
+import numpy as np
+
 from Vector import Vector
 
-getcontext().prec = 30
+
+NUM_DECIMAL_PLACES = 3
+
+
+def write_coefficient(coefficient, is_initial_term=False):
+    coefficient = round(coefficient, NUM_DECIMAL_PLACES)
+    if coefficient % 1 == 0:
+        coefficient = int(coefficient)
+
+    output = ''
+
+    if coefficient < 0:
+        output += '-'
+    if coefficient > 0 and not is_initial_term:
+        output += '+'
+
+    if not is_initial_term:
+        output += ' '
+
+    if abs(coefficient) != 1:
+        output += '{}'.format(abs(coefficient))
+
+    return output
 
 
 class Plane(object):
@@ -19,8 +43,8 @@ class Plane(object):
         self.normal_vector = normal_vector
 
         if not constant_term:
-            constant_term = Decimal('0')
-        self.constant_term = Decimal(constant_term)
+            constant_term = 0.0
+        self.constant_term = float(constant_term)
 
         self.set_basepoint()
 
@@ -34,7 +58,7 @@ class Plane(object):
             initial_index = Plane.first_nonzero_index(n)
             initial_coefficient = n[initial_index]
 
-            basepoint_coords[initial_index] = c / initial_coefficient
+            basepoint_coords[initial_index] = c / float(initial_coefficient)
             self.basepoint = Vector(basepoint_coords)
 
         except Exception as e:
@@ -45,34 +69,12 @@ class Plane(object):
 
     def __str__(self):
 
-        num_decimal_places = 3
-
-        def write_coefficient(coefficient, is_initial_term=False):
-            coefficient = round(coefficient, num_decimal_places)
-            if coefficient % 1 == 0:
-                coefficient = int(coefficient)
-
-            output = ''
-
-            if coefficient < 0:
-                output += '-'
-            if coefficient > 0 and not is_initial_term:
-                output += '+'
-
-            if not is_initial_term:
-                output += ' '
-
-            if abs(coefficient) != 1:
-                output += '{}'.format(abs(coefficient))
-
-            return output
-
         n = self.normal_vector
 
         try:
             initial_index = Plane.first_nonzero_index(n)
             terms = [write_coefficient(n[i], is_initial_term=(i == initial_index)) + 'x_{}'.format(i + 1)
-                     for i in range(self.dimension) if round(n[i], num_decimal_places) != 0]
+                     for i in range(self.dimension) if round(n[i], NUM_DECIMAL_PLACES) != 0]
             output = ' '.join(terms)
 
         except Exception as e:
@@ -81,7 +83,7 @@ class Plane(object):
             else:
                 raise 'traceback.format_exc():\n%s' % traceback.format_exc()
 
-        constant = round(self.constant_term, num_decimal_places)
+        constant = round(self.constant_term, NUM_DECIMAL_PLACES)
         if constant % 1 == 0:
             constant = int(constant)
         output += ' = {}'.format(constant)
@@ -89,10 +91,11 @@ class Plane(object):
         return output
 
     @staticmethod
-    def first_nonzero_index(iterable):
-        for k, item in enumerate(iterable):
-            if not MyDecimal(item).is_near_zero():
-                return k
+    def first_nonzero_index(vector):
+        # 一次扫描整个坐标数组，找出第一个绝对值不小于1e-10的位置
+        nonzero = np.abs(vector.coordinates) >= 1e-10
+        if nonzero.any():
+            return int(nonzero.argmax())
         raise Exception(Plane.NO_NONZERO_ELTS_FOUND_MSG)
 
     def is_parallel_to(self, ell):
@@ -103,13 +106,13 @@ class Plane(object):
 
     def intersection_with(self, ell):
         try:
-            A, B = self.normal_vector.coordinates
-            C, D = ell.normal_vector.coordinates
+            A, B = Vector._float_coordinates(self.normal_vector).tolist()
+            C, D = Vector._float_coordinates(ell.normal_vector).tolist()
             k1 = self.constant_term
             k2 = ell.constant_term
             x_numerator = D * k1 - B * k2
             y_numerator = -C * k1 + A * k2
-            one_over_denom = Decimal('1') / (A * D - B * C)
+            one_over_denom = 1.0 / (A * D - B * C)
 
             return Vector([x_numerator, y_numerator]).times_scaler(one_over_denom)
 
@@ -137,9 +140,3 @@ class Plane(object):
             if str(e) == Plane.NO_NONZERO_TO_EQ:
                 print '被除数为0'
                 return basepoint_difference.is_orthogonal_to(n)
-
-
-
-class MyDecimal(Decimal):
-    def is_near_zero(self, eps=1e-10):
-        return abs(self) < eps
@@ -0,0 +1,51 @@
+# coding=utf-8
+# 批量点乘/叉乘的数值内核：一次处理N对向量，numba可用时用prange多线程并行，否则退回NumPy的整体运算
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _batch_dot(A, B, out):
+        for i in prange(A.shape[0]):
+            s = 0.0
+            for j in range(A.shape[1]):
+                s += A[i, j] * B[i, j]
+            out[i] = s
+
+    @njit(parallel=True, cache=True)
+    def _batch_cross(A, B, out):
+        for i in prange(A.shape[0]):
+            out[i, 0] = A[i, 1] * B[i, 2] - A[i, 2] * B[i, 1]
+            out[i, 1] = A[i, 2] * B[i, 0] - A[i, 0] * B[i, 2]
+            out[i, 2] = A[i, 0] * B[i, 1] - A[i, 1] * B[i, 0]
+
+    def batch_dot(A, B):
+        """
+        :param A: (N, d)的float64连续数组
+        :param B: 与A形状相同
+        :return: (N,)数组，第i项为A[i]·B[i]
+        """
+        out = np.empty(A.shape[0], dtype=np.float64)
+        _batch_dot(A, B, out)
+        return out
+
+    def batch_cross(A, B):
+        """
+        :param A: (N, 3)的float64连续数组
+        :param B: 与A形状相同
+        :return: (N, 3)数组，第i行为A[i]×B[i]
+        """
+        out = np.empty((A.shape[0], 3), dtype=np.float64)
+        _batch_cross(A, B, out)
+        return out
+
+else:
+    def batch_dot(A, B):
+        return np.einsum('ij,ij->i', A, B)
+
+    def batch_cross(A, B):
+        return np.cross(A, B)